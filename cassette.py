@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+RECORD = "record" # Live requests, every request/response pair is appended to the cassette
+REPLAY = "replay" # No network, every response comes from the cassette
+OFF = "off"
+MODES = (RECORD, REPLAY, OFF)
+
+MAXBYTES = 50 * 1024 * 1024 # Cassette size at which it is rotated to cassette.jsonl.1
+BACKUPS = 3 # Rotated cassettes kept, older recordings are deleted
+
+
+class CassetteMiss(KeyError):
+    """
+    Raised in replay mode when a request was never recorded.
+    """
+
+
+def requestKey(request):
+    """
+    Returns a stable hash of a request (model and messages), used to match replays.
+
+    Args:
+        request (dict): JSON-serializable request body.
+
+    Returns:
+        str: Hex digest.
+    """
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    Append-only JSON lines file of API requests and their responses.
+
+    Each line holds the request, the response text, token usage and latency,
+    keyed by requestKey(). In replay mode lookups are served from the file so
+    runs are deterministic and need no network or API key. Once the file
+    reaches maxBytes it is rotated like a log, keeping backups older files
+    that replay still reads. Replay only indexes where each key's line is,
+    entries are read from disk when looked up.
+    """
+
+    def __init__(self, path, mode=RECORD, maxBytes=MAXBYTES, backups=BACKUPS):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.maxBytes = maxBytes
+        self.backups = backups
+        self.index = None # key -> (file, offset), built on first lookup
+        self.lock = threading.Lock()
+
+    def _files(self):
+        # Oldest first, so later recordings of a key win
+        rotated = [f"{self.path}.{n}" for n in range(self.backups, 0, -1)]
+        return [path for path in rotated + [self.path] if os.path.exists(path)]
+
+    def _load(self):
+        self.index = {}
+        for path in self._files():
+            with open(path, "rb") as file:
+                while True:
+                    offset = file.tell()
+                    line = file.readline()
+                    if not line:
+                        break
+                    if line.strip():
+                        self.index[json.loads(line)["key"]] = (path, offset) # latest recording wins
+
+    def _read(self, path, offset):
+        with open(path, "rb") as file:
+            file.seek(offset)
+            return json.loads(file.readline())
+
+    def _rotate(self):
+        # cassette.jsonl -> .1 -> .2 ..., the oldest past backups is deleted
+        for n in range(self.backups, 0, -1):
+            source = f"{self.path}.{n - 1}" if n > 1 else self.path
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{n}")
+        if self.backups < 1:
+            os.remove(self.path)
+        self.index = None # offsets moved with the files
+
+    def lookup(self, request):
+        """
+        Returns the recorded entry for a request.
+
+        Raises:
+            CassetteMiss: If the request was never recorded.
+        """
+        key = requestKey(request)
+        with self.lock:
+            if self.index is None:
+                self._load()
+            location = self.index.get(key)
+            if location is None:
+                raise CassetteMiss(f"No recording for {request.get('model')} request {key[:12]}")
+            return self._read(*location)
+
+    def record(self, request, output, promptTokens, completionTokens, latency):
+        """
+        Appends a request and its response to the cassette, rotating it first if it is full.
+        """
+        entry = {
+            "key": requestKey(request),
+            "time": time.time(),
+            "request": request,
+            "response": {
+                "content": output,
+                "promptTokens": promptTokens,
+                "completionTokens": completionTokens,
+            },
+            "latency": latency,
+        }
+        with self.lock:
+            if self.maxBytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.maxBytes:
+                self._rotate()
+            with open(self.path, "ab") as file:
+                offset = file.tell()
+                file.write((json.dumps(entry) + "\n").encode("utf-8"))
+            if self.index is not None:
+                self.index[entry["key"]] = (self.path, offset)
@@ -0,0 +1,97 @@
+import hashlib
+import random
+import re
+
+
+SHINGLESIZE = 4 # Words per shingle
+NUMPERM = 128 # MinHash signature length
+BANDS = 32 # LSH bands, NUMPERM / BANDS rows each. Catches pairs from roughly 0.4 similarity upward
+THRESHOLD = 0.8 # Estimated Jaccard similarity at which two applicants count as duplicates
+MINSHINGLES = 50 # Texts with fewer shingles (about 50 words) are never matched, short boilerplate looks the same for everyone
+
+MERSENNE = (1 << 61) - 1
+
+# Fixed seed so signatures are comparable between runs
+_rng = random.Random(1)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE), _rng.randrange(0, MERSENNE)) for _ in range(NUMPERM)]
+
+
+def shingles(text):
+    """
+    Splits text into a set of overlapping word n-grams.
+
+    Args:
+        text (str): Resume/coverletter text.
+
+    Returns:
+        set: 64-bit hashes of each shingle, empty if the text is shorter than SHINGLESIZE words.
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    grams = (" ".join(words[i:i + SHINGLESIZE]) for i in range(len(words) - SHINGLESIZE + 1))
+    return {int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "big") for g in grams}
+
+def signature(text):
+    """
+    Computes the MinHash signature of a text.
+
+    Returns:
+        tuple: NUMPERM minimum hash values, or None if the text has fewer than MINSHINGLES shingles.
+    """
+    hashes = shingles(text)
+    if len(hashes) < MINSHINGLES:
+        return None
+    return tuple(min((a * h + b) % MERSENNE for h in hashes) for a, b in PERMUTATIONS)
+
+def similarity(sigA, sigB):
+    """
+    Estimates Jaccard similarity from two MinHash signatures.
+    """
+    return sum(x == y for x, y in zip(sigA, sigB)) / NUMPERM
+
+
+class DuplicateIndex:
+    """
+    Incremental LSH index that matches near-duplicate applicants.
+
+    Applicants are added one at a time. An applicant close enough to an
+    earlier representative is matched to it, so a caller screening
+    applicants in order can reuse the representative's result. Otherwise it
+    becomes a representative itself. Only representatives are indexed and
+    compared against, so a chain of small differences can never link two
+    different applicants. Only signatures are kept, not the texts.
+    """
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.rows = NUMPERM // BANDS
+        self.buckets = {}
+        self.signatures = {} # representative key -> signature
+        self.order = {} # representative key -> position added, earliest wins ties
+
+    def add(self, key, text):
+        """
+        Adds an applicant to the index.
+
+        Args:
+            key (str): Unique applicant id.
+            text (str): Combined resume and coverletter text.
+
+        Returns:
+            str: Representative key if the applicant duplicates an earlier one, else None.
+        """
+        sig = signature(text)
+        if sig is None: # too little text to tell applicants apart
+            return None
+
+        bands = [(band, sig[band * self.rows:(band + 1) * self.rows]) for band in range(BANDS)]
+        candidates = {other for band in bands for other in self.buckets.get(band, ())}
+        matches = [(similarity(sig, self.signatures[other]), -self.order[other], other) for other in candidates]
+        matches = [match for match in matches if match[0] >= self.threshold]
+        if matches:
+            return max(matches)[2] # most similar, the earliest on a tie
+
+        self.signatures[key] = sig
+        self.order[key] = len(self.order)
+        for band in bands:
+            self.buckets.setdefault(band, []).append(key)
+        return None
@@ -0,0 +1,93 @@
+import os
+from pdfminer.high_level import extract_text
+import ai
+
+
+def pdfToPlaintext(filePath, onError=None):
+    """
+    Converts a PDF file to plaintext.
+
+    Errors are passed to onError if given, so GUI callers can show a
+    dialog, otherwise they are logged.
+
+    Args:
+        filePath (str): Path to the PDF file.
+        onError (callable): Optional, called with the exception if the PDF cannot be processed.
+
+    Returns:
+        str: Extracted plaintext or None if the PDF cannot be processed.
+    """
+    try:
+        if filePath is None:  # Ensure file path is provided
+            return None
+
+        # Extract text from the PDF file using pdfminer
+        text = extract_text(filePath)
+
+        return text.strip() if text else None
+
+    except Exception as e:
+        if onError:
+            onError(e)
+        else:
+            ai.logError(e)
+        return None
+
+def parseType(filePath):
+    """
+    Given some file path, parses the type of file and matches to the other.
+
+    returns:
+        docType   "Resume" or "CoverLetter"
+        nameKey   "name of person" (for dictionary key)
+        source    "job board the file came from" ("" if missing)
+    """
+    filename = os.path.basename(filePath)
+    base, _ = os.path.splitext(filename) # unpack tuple to grab full filename
+    parts = base.split("_", 2) # Splits to ["Type", "First-Last", "GetHired"]
+
+    if len(parts) < 2: # If filename is invalid handle gracefully
+        return ("Unknown", "Unknown", "")
+
+    docType = parts[0] # Resume or coverletter
+    nameKey = parts[1] # Name
+    source = parts[2] if len(parts) > 2 else "" # Job board
+
+    if nameKey.count('-') > 1: # If the person has a middle hyphenated name (this took me forever to debug)
+        nameParts = nameKey.split('-') # Split by the -
+        nameKey = f"{nameParts[0]}-{nameParts[-1]}" # Grab first and last entry (first and last names).
+        # This is not the best solution, i.e for names like Anna o'Keefe it shows it as Anna-O-Keefe which will simplify to Anna Keefe in the program.
+        # I cannot figure out a better one.
+
+    return docType, nameKey, source
+
+def pairFiles(filePaths):
+    """
+    Pairs resumes and coverletters by name and source.
+
+    Args:
+        filePaths (iterable): PDF paths.
+
+    Returns:
+        dict: Maps candidate key (First-Last_Source) to name, source, resume & coverletter path
+    """
+    pairs = {}
+
+    for filePath in filePaths:
+        docType, nameKey, source = parseType(filePath) # unpack tuple into type (resume/coverletter), name and source
+
+        if docType not in ("Resume", "CoverLetter"): # a weird glitch happened and we should skip this file (capital L is important)
+            continue
+
+        baseKey = f"{nameKey}_{source}" if source else nameKey
+        candidateKey, n = baseKey, 1
+        while candidateKey in pairs and pairs[candidateKey][docType] is not None: # Same name, source and type twice, keep both instead of overwriting
+            n += 1
+            candidateKey = f"{baseKey} ({n})"
+
+        if candidateKey not in pairs: # If its a new candidate create a new dictionary entry
+            pairs[candidateKey] = {"Name": nameKey, "Source": source, "Resume": None, "CoverLetter": None}
+
+        pairs[candidateKey][docType] = filePath # edit the resume/coverletter key to be the file path
+
+    return pairs
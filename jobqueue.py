@@ -0,0 +1,266 @@
+import sqlite3
+from abc import ABC, abstractmethod
+import json
+import time
+import uuid
+
+
+DEFAULTVISIBILITY = 300 # Seconds a leased job stays invisible to other workers before it is retried
+DEFAULTMAXATTEMPTS = 3 # Leases per job before it is marked failed
+
+
+class JobQueue(ABC):
+    """
+    Interface for a durable queue of screening jobs.
+
+    A job moves pending -> leased -> done/failed, or pending -> cancelled.
+    A worker leases a job for a visibility timeout, if it doesn't complete
+    or extend the lease in time (e.g. the worker crashed) the job becomes
+    leasable again. Backends subclass this and register themselves with
+    registerBackend().
+    """
+
+    @abstractmethod
+    def enqueue(self, payload, batch=None):
+        """
+        Adds a job to the queue.
+
+        Args:
+            payload (dict): JSON-serializable job description.
+            batch (str): Optional batch id used to group jobs from one run.
+
+        Returns:
+            int: Job id.
+        """
+
+    @abstractmethod
+    def lease(self, workerId, visibility=DEFAULTVISIBILITY):
+        """
+        Leases the oldest available job.
+
+        Returns:
+            tuple: (jobId, payload, attempts) or None if no job is available.
+        """
+
+    @abstractmethod
+    def extend(self, jobId, workerId, visibility=DEFAULTVISIBILITY):
+        """
+        Extends a held lease. Returns False if the lease was lost.
+        """
+
+    @abstractmethod
+    def complete(self, jobId, workerId, result):
+        """
+        Stores a job result. Returns False if the lease was lost.
+        """
+
+    @abstractmethod
+    def fail(self, jobId, workerId, error):
+        """
+        Releases a job after an error so it can be retried, or marks it failed
+        once it has used all of its attempts.
+        """
+
+    @abstractmethod
+    def cancelBatch(self, batch):
+        """
+        Marks a batch's pending jobs cancelled so no worker picks them up.
+        Jobs already leased run to completion.
+        """
+
+    @abstractmethod
+    def batchStatus(self, batch):
+        """
+        Returns every job in a batch.
+
+        Returns:
+            list: Dicts with id, state, payload, result and error keys.
+        """
+
+    @abstractmethod
+    def batchCounts(self, batch):
+        """
+        Returns how many of a batch's jobs are in each state, cheaper than batchStatus for polling.
+
+        Returns:
+            dict: State -> number of jobs.
+        """
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Default backend, a single SQLite database file.
+
+    Each call opens its own connection so the queue can be shared between
+    threads and processes. Leasing runs inside BEGIN IMMEDIATE so two workers
+    can never lease the same job. SQLite's locking is only reliable on a local
+    disk, so every worker must run on the machine that holds the file. For
+    several hosts, register a networked backend instead.
+    """
+
+    def __init__(self, path, maxAttempts=DEFAULTMAXATTEMPTS):
+        self.path = path
+        self.maxAttempts = maxAttempts
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    batch TEXT,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    leaseUntil REAL,
+                    result TEXT,
+                    error TEXT,
+                    updated REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobsState ON jobs (state, leaseUntil)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobsBatch ON jobs (batch)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None) # autocommit, transactions are explicit
+        conn.execute("PRAGMA journal_mode=DELETE") # rollback journal (WAL needs shared memory), also converts queues created in WAL mode
+        return _Connection(conn)
+
+    def enqueue(self, payload, batch=None):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (batch, payload, updated) VALUES (?, ?, ?)",
+                (batch, json.dumps(payload), time.time()),
+            )
+            return cursor.lastrowid
+
+    def lease(self, workerId, visibility=DEFAULTVISIBILITY):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    now = time.time()
+                    row = conn.execute(
+                        """SELECT id, payload, attempts FROM jobs
+                           WHERE state = 'pending' OR (state = 'leased' AND leaseUntil < ?)
+                           ORDER BY id LIMIT 1""",
+                        (now,),
+                    ).fetchone()
+                    if row is None:
+                        conn.execute("COMMIT")
+                        return None
+
+                    jobId, payload, attempts = row
+                    if attempts >= self.maxAttempts: # lease expired on its last attempt, the worker likely crashed
+                        conn.execute(
+                            "UPDATE jobs SET state = 'failed', error = ?, updated = ? WHERE id = ?",
+                            ("Lease expired on final attempt", now, jobId),
+                        )
+                        continue
+
+                    conn.execute(
+                        """UPDATE jobs SET state = 'leased', worker = ?, leaseUntil = ?,
+                           attempts = attempts + 1, updated = ? WHERE id = ?""",
+                        (workerId, now + visibility, now, jobId),
+                    )
+                    conn.execute("COMMIT")
+                    return jobId, json.loads(payload), attempts + 1
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def extend(self, jobId, workerId, visibility=DEFAULTVISIBILITY):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET leaseUntil = ?, updated = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (time.time() + visibility, time.time(), jobId, workerId),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, jobId, workerId, result):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET state = 'done', result = ?, error = NULL, leaseUntil = NULL, updated = ?
+                   WHERE id = ? AND worker = ? AND state = 'leased'""",
+                (json.dumps(result), time.time(), jobId, workerId),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, jobId, workerId, error):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                   error = ?, leaseUntil = NULL, updated = ?
+                   WHERE id = ? AND worker = ? AND state = 'leased'""",
+                (self.maxAttempts, str(error), time.time(), jobId, workerId),
+            )
+            return cursor.rowcount == 1
+
+    def cancelBatch(self, batch):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'cancelled', updated = ? WHERE batch = ? AND state = 'pending'",
+                (time.time(), batch),
+            )
+
+    def batchStatus(self, batch):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, state, payload, result, error FROM jobs WHERE batch = ? ORDER BY id",
+                (batch,),
+            ).fetchall()
+        return [{
+            "id": jobId,
+            "state": state,
+            "payload": json.loads(payload),
+            "result": json.loads(result) if result else None,
+            "error": error,
+        } for jobId, state, payload, result, error in rows]
+
+    def batchCounts(self, batch):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) FROM jobs WHERE batch = ? GROUP BY state", (batch,)).fetchall()
+        return dict(rows)
+
+
+class _Connection:
+    # Context manager that closes the sqlite connection (sqlite3's own only ends the transaction)
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+
+BACKENDS = {"sqlite": SQLiteJobQueue}
+
+def registerBackend(scheme, cls):
+    """
+    Registers a JobQueue subclass for a URL scheme, e.g. registerBackend("redis", RedisJobQueue).
+    The class is constructed with the rest of the URL after "scheme://".
+    """
+    BACKENDS[scheme] = cls
+
+def openQueue(url):
+    """
+    Opens a job queue from a URL such as "sqlite://C:/queue.db". A plain path opens a SQLite queue.
+
+    Args:
+        url (str): Queue URL or SQLite file path.
+
+    Returns:
+        JobQueue: The opened queue.
+    """
+    scheme, sep, location = url.partition("://")
+    if not sep: # plain file path
+        return SQLiteJobQueue(url)
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unknown job queue backend: {scheme}")
+    return BACKENDS[scheme](location)
+
+def newBatchId():
+    """
+    Returns a unique id for grouping the jobs of one screening run.
+    """
+    return uuid.uuid4().hex
@@ -1,15 +1,19 @@
 import tkinter as tk
-from tkinter import messagebox, filedialog, ttk
-from pdfminer.high_level import extract_text
+from tkinter import messagebox, filedialog, ttk, simpledialog
 import webbrowser
 import os
 import json
 import sys
 import threading
+import uuid
 import re
 from datetime import datetime
 import pandas as pd
 import ai
+import cassette
+import documents
+import jobqueue
+import pipeline
 
 
 APPNAME = "BrightIsle CV Screener"
@@ -17,6 +21,9 @@ APPDATADIR = os.path.join(os.getenv("APPDATA"), APPNAME)
 CONFIGFILE = os.path.join(APPDATADIR, "config.json")
 LOGFILE = os.path.join(APPDATADIR, "log.txt")
 
+QUEUEPOLLINTERVAL = 2 # Seconds between job queue status checks
+DEFAULTPOSTING = "Default" # Posting name used when no postings are saved
+
 
 class Window(tk.Tk):
     def __init__(self, title="None", geometry="600x400", close=True, parent=None, isRoot=False):
@@ -42,6 +49,7 @@ class Window(tk.Tk):
     
     def closeApp(self):
         if self.isRoot:
+            extractionCache.shutdown() # Don't wait on background extraction
             sys.exit(0)
         elif self.parent:
             self.parent.deiconify()
@@ -51,7 +59,8 @@ class Window(tk.Tk):
 
 def drop(event=None):
     """
-    Adds PDF files to the listbox either via a file dialog.
+    Adds PDF files to the listbox either via a file dialog, and starts
+    extracting them in the background.
     
     Args:
         event: event (None)
@@ -64,12 +73,13 @@ def drop(event=None):
                 if file not in addedFiles: # check for duplicates
                     listbox.insert(tk.END, file)
                     addedFiles.add(file) 
+                    extractionCache.schedule(file, documents.parseType(file)[1]) # Extract while the user writes criteria
                 else:
                     messagebox.showinfo("Duplicate File", f"{os.path.basename(file)} is already in the dropbox.")
             else:
                 handleError(401)
 
-    addedFiles = set()
+    addedFiles = set(listbox.get(0, tk.END)) # Files already in the dropbox
 
     if event is None: # If the user double clicks
         files = filedialog.askopenfilenames(
@@ -83,7 +93,7 @@ def drop(event=None):
 
 def delete(event=None):
     """
-    Deletes selected items from the listbox.
+    Deletes selected items from the listbox and drops their background extraction.
 
     Args:
         event: Event object (optional).
@@ -91,6 +101,7 @@ def delete(event=None):
 
     items = listbox.curselection() # Grab selected file
     for i in reversed(items): 
+        extractionCache.cancel(listbox.get(i))
         listbox.delete(i)                
     return
 
@@ -108,22 +119,25 @@ def readme():
 
 
 
-def runAI(resume, coverletter, name):
+def runAI(resume, coverletter, name, criteria, strength, cancel=None):
     """
     Runs the AI subprocess for analyzing the resume.
 
     Args:
-        resume (str/None): Plaintext content of the resume.
-        coverletter (str/None): Plaintext content of coverletter.
+        resume (str/None): Sanitized plaintext content of the resume.
+        coverletter (str/None): Sanitized plaintext content of coverletter.
+        name (str): Name key of the applicant.
+        criteria (str): Screening criteria of the posting.
+        strength (str): Filter strength of the posting.
+        cancel (threading.Event): Optional, aborts the request when set.
 
     Returns:
-        str: Output from the AI script, or None if an error occurs.
+        dict: Evaluation from the AI script (final output and per-tier records), or None if an error occurs.
+
+    Raises:
+        ai.Cancelled: If the run was cancelled.
     """
     try:
-        criteria = userCriteria.get("1.0", tk.END).strip() # Get criteria from textbox
-        strength = str(strengthSlider.get()) # Get strength from slider and turn into a string
-        
-            
         if not criteria: # Make sure the criteria is not falsy
             handleError(404)
             return
@@ -134,48 +148,37 @@ def runAI(resume, coverletter, name):
         elif coverletter is None: # Same as resume
             coverletter = "None"
             
-        if not apiKey: # Ensure api key is set for safety purposes
+        if not apiKey and (ai.loadConfig() or {}).get("CASSETTE_MODE") != cassette.REPLAY: # Ensure api key is set for safety purposes, replay makes no requests
             handleError(402)
             root.closeApp()
 
         try:
-            result = ai.main(name, resume, coverletter, criteria, strength) # Get result of AI script
+            result = ai.evaluate(name, resume, coverletter, criteria, strength, sanitized=True, cancel=cancel) # Get result of AI cascade
             return result
         
+        except ai.Cancelled: # Not an error, let the pipeline stop
+            raise
         except Exception as e:
             logError(e)
+    except ai.Cancelled:
+        raise
     except Exception as e:
         logError(e)
 
 def gatherPairs():
     """
-    Returns a dictionary that maps namekey to resume & coverletter path
+    Returns a dictionary that maps candidate key (First-Last_Source) to name, source, resume & coverletter path
     """
-    pairs = {}
-
-    for i in range(listbox.size()): 
-        filePath = listbox.get(i) # Grab ith file path
-        docType, nameKey = parseType(filePath) # unpack tuple into type (resume/coverletter) and name
-
-        if nameKey not in pairs: # If its a new name create a new dictionary entry
-            pairs[nameKey] = {"Resume": None, "CoverLetter": None}
-
-        if docType == "Resume": # If the name is in the dictionary edit the resume key to be the file path to the resume
-            pairs[nameKey]["Resume"] = filePath
-        elif docType == "CoverLetter": # Same as above but with coverletter (capital L is important)
-            pairs[nameKey]["CoverLetter"] = filePath
-        else: # else a weird glitch happened and we should skip this file
-            continue
+    return documents.pairFiles(listbox.get(0, tk.END))
 
-    return pairs
-
-def handleError(err, e=None): 
+def handleError(err, e=None, log=True): 
     """
     Handles application-specific errors and displays messages.
 
     Args:
         err (int): Error code.
         f (str): Optional filename for file-specific errors.
+        log (bool): False if the error was already logged (e.g. on a background thread).
     """
 
     errorMessages = {
@@ -191,11 +194,13 @@ def handleError(err, e=None):
         409 : "Please add atleast one PDF file to process.",
         410 : "README.MD file not found.",
         411 : "Failed to process file, is the pdf scanned or empty?",
+        412 : "Could not open the recorded run, is the file damaged?",
         999 : "Unknown Error, Please contact support",
     }
    
     message = errorMessages.get(err)
-    logError(e)
+    if log:
+        logError(e)
     messagebox.showerror("Error", message)
 
 def getPackagedPath(filename):
@@ -259,7 +264,7 @@ def checkConfig():
             try:
                 config = json.load(file)
                 apiKey = config.get("OPENAI_API_KEY", "").strip() # read api key from json
-                if not apiKey: # ensure api key is there
+                if not apiKey and config.get("CASSETTE_MODE") != cassette.REPLAY: # ensure api key is there, replay needs none
                     handleError(402)
                     return 
                 return apiKey
@@ -267,61 +272,185 @@ def checkConfig():
                 handleError(403)
                 return 
 
-def run():
+def run(profiles=None):
     """
     Executes the resume screening process for all files in the listbox.
-    """
-    # Helper function to process files
-    def processFiles():
-        allOut = [] 
-        allPaths = []
-        for nameKey, docs in pairs.items():
-            
-            resumePath = docs.get("Resume") # Grab file path (value) from Resume (key) in dict
-            coverPath = docs.get("CoverLetter") # Grab file path (value) from CoverLetter (key) in dict
 
-            if not resumePath and not coverPath: # if both are somehow missing, skip the entry
-                continue
+    Every candidate's PDFs are extracted and sanitized once, then evaluated
+    against each posting profile (candidates x postings matrix). With a job
+    queue each candidate is one job carrying every posting, so a worker
+    extracts it once for all of them, and near-duplicates are not queued.
 
-            resumeText = pdfToPlaintext(resumePath) # Grab the text from the pdfs and turn into string plaintext
-            coverText = pdfToPlaintext(coverPath) 
-            
-            if (not resumeText or resumeText.strip() == "") and (not coverText or coverText.strip() == ""): # Ensure plaintext is not falsy
-                continue
-
-            try:
-                
-                output = runAI(resumeText, coverText, nameKey) # run AI 
-                if output is None: # Ensure output is not falsy
-                    continue
-                
-                allOut.append(output) # append output to list
-                allPaths.append((nameKey, resumePath, coverPath)) # append path info as tuple
+    Args:
+        profiles (dict): Optional posting name -> {"criteria": str, "strength": str}.
+                         Defaults to the saved postings, or the current criteria and strength if none are saved.
+    """
+    # Helper function to process files, streamed so only a few extracted texts are held at once
+    def processFiles():
+        store = pipeline.ResultStore(profiles)
+        try:
+            evaluator = lambda *args: runAI(*args, cancel=cancel)
+            for record in pipeline.screen(pairs, profiles, pdfToPlaintext, evaluator, cancel=cancel, cache=extractionCache): # discover -> (pre-extracted) texts -> evaluate
+                store.add(record) # sink, still shows what finished if the run is cancelled
                 
-            except Exception:
+        except (Exception, SystemExit) as e: # ai exits on API errors, that must not leave the loading bar up forever
+            if isinstance(e, SystemExit) and not e.code: # runAI asked the app to close (missing API key)
                 root.after(0, loadingWindow.stop)
-                root.after(0, lambda: handleError(999))
-                root.after(0, root.destroy)
+                root.after(0, root.closeApp)
                 return
-        
+            logError(e)
+            root.after(0, lambda: handleError(999)) # Then show whatever finished before the error
 
+        recordRun(store, profiles) # Keep the evaluations for offline re-thresholding
         root.after(0, loadingWindow.stop) # Destroy loading bar
-        root.after(0, lambda: showResultWindow(allOut, allPaths)) # Open results window
+        root.after(0, lambda: showResultWindow(store)) # Open results window
+
+    # Helper function to hand candidates to queue workers and wait for their results
+    def processQueued():
+        try:
+            queue = jobqueue.openQueue(queueUrl)
+            batch = jobqueue.newBatchId()
+            candidates = pipeline.sanitize(pipeline.extract(pipeline.discover(pairs), pdfToPlaintext, cache=extractionCache))
+            duplicates = pipeline.queueJobs(candidates, queue, batch, profiles, cancel) # one job per unique candidate, texts (mostly pre-extracted) only used to find duplicates
+
+            while True: # Wait until every job is finished or out of attempts
+                if cancel.is_set(): # Withdraw jobs no worker has started, keep what is done
+                    queue.cancelBatch(batch)
+                counts = queue.batchCounts(batch)
+                if not set(counts) - {"done", "failed", "cancelled"} or cancel.is_set():
+                    break
+                cancel.wait(QUEUEPOLLINTERVAL)
+            jobs = queue.batchStatus(batch)
+
+        except Exception as e:
+            root.after(0, loadingWindow.stop)
+            root.after(0, lambda: handleError(999, e))
+            root.after(0, root.deiconify)
+            return
+
+        store = pipeline.ResultStore(profiles)
+        screened = {} # candidate id -> {posting: evaluation}, for the duplicates that were not queued
+        for job in jobs:
+            if job["state"] == "failed": # Already retried by the workers, just log it
+                logError(f"Job for {job['payload']['name']} failed: {job['error']}")
+                continue
+            if job["state"] != "done": # Cancelled or still running when the run was cancelled
+                continue
+            payload, result = job["payload"], job["result"]
+            for posting in result["failed"]:
+                logError(f"{payload['name']} could not be screened for {posting}, see the worker's log")
+            screened[payload["candidate"]] = result["evaluations"]
+            store.add({"id": payload["candidate"], "name": payload["name"], "resumePath": payload["resumePath"],
+                       "coverPath": payload["coverPath"], "evaluations": result["evaluations"]})
+
+        for candidate, representative in duplicates: # Reuse the representative's result, like pipeline.evaluate
+            if screened.get(representative):
+                candidate["evaluations"] = {posting: dict(evaluation, duplicateOf=representative) for posting, evaluation in screened[representative].items()}
+                store.add(candidate)
+
+        recordRun(store, profiles)
+        root.after(0, loadingWindow.stop)
+        root.after(0, lambda: showResultWindow(store))
 
     
     if listbox.size() == 0: # Make sure there are files in the listbox to process
         handleError(409)
         return 
     
-    if not userCriteria.get("1.0", tk.END).strip():
-        handleError(404)
-        return
+    if profiles is None:
+        if postings: # Screen against every saved posting
+            profiles = dict(postings)
+        else: # Otherwise just the criteria currently in the textbox
+            criteria = userCriteria.get("1.0", tk.END).strip()
+            if not criteria:
+                handleError(404)
+                return
+            profiles = {DEFAULTPOSTING: {"criteria": criteria, "strength": str(strengthSlider.get())}}
     
     root.withdraw()
-    loadingWindow = showLoadingBar() # open loading bar
+    cancel = threading.Event() # Set by the Cancel button, stops dispatching and aborts requests in flight
+    loadingWindow = showLoadingBar(onCancel=cancel.set) # open loading bar
     pairs = gatherPairs() # create dictionary
 
-    threading.Thread(target=processFiles, daemon=True).start() # New thread for processing so GUI doesn't crash
+    config = ai.loadConfig() or {}
+    queueUrl = config.get("JOB_QUEUE") # If set, workers (worker.py) do the screening instead of this process
+    if queueUrl:
+        threading.Thread(target=processQueued, daemon=True).start()
+    else:
+        threading.Thread(target=processFiles, daemon=True).start() # New thread for processing so GUI doesn't crash
+
+def recordRun(store, profiles):
+    """
+    Saves a finished run's evaluations to the recordings folder so they can be
+    reopened with Open, re-thresholded and exported without calling the API.
+
+    Args:
+        store (pipeline.ResultStore): Results of the run.
+        profiles (dict): Postings the run screened against.
+    """
+    config = ai.loadConfig() or {}
+    if config.get("CASSETTE_MODE") == cassette.OFF:
+        return
+
+    try:
+        os.makedirs(ai.RECORDINGSDIR, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        store.save(os.path.join(ai.RECORDINGSDIR, f"run-{timestamp}-{uuid.uuid4().hex[:8]}.jsonl"), profiles) # suffix so runs in the same second don't overwrite each other
+    except Exception as e: # Not worth interrupting the user over, the results are still shown
+        logError(e)
+
+def openRecording():
+    """
+    Opens a recorded run in the results window, no API calls are made.
+    """
+    path = filedialog.askopenfilename(
+        title="Open Recorded Run",
+        initialdir=ai.RECORDINGSDIR,
+        filetypes=[("Recorded runs", "*.jsonl")],
+    )
+    if not path: # If the dialog was cancelled
+        return
+
+    try:
+        store, _ = pipeline.ResultStore.load(path)
+    except Exception as e:
+        handleError(412, e)
+        return
+    showResultWindow(store)
+
+def addPosting():
+    """
+    Saves the current criteria and strength as a named job posting.
+
+    When postings are saved, Run screens every applicant against all of them.
+    """
+    criteria = userCriteria.get("1.0", tk.END).strip()
+    if not criteria:
+        handleError(404)
+        return
+
+    name = simpledialog.askstring("Add Posting", "Posting name:", parent=root)
+    if not name or not name.strip():
+        return
+
+    postings[name.strip()] = {"criteria": criteria, "strength": str(strengthSlider.get())}
+    updatePostingsLabel()
+
+def clearPostings():
+    """
+    Removes all saved job postings.
+    """
+    postings.clear()
+    updatePostingsLabel()
+
+def updatePostingsLabel():
+    """
+    Shows the names of the saved job postings under the criteria box.
+    """
+    if postings:
+        postingsLabel.config(text=f"Postings: {', '.join(postings)}")
+    else:
+        postingsLabel.config(text="Postings: none (uses criteria above)")
 
 def logError(error):
     """
@@ -340,62 +469,34 @@ def logError(error):
   
 def pdfToPlaintext(filePath):
     """
-    Converts a PDF file to plaintext.
+    Converts a PDF file to plaintext, showing an error if the PDF cannot be processed.
+
+    Runs on extraction threads, so the error is logged here and the dialog
+    is handed to the Tk thread.
 
     Args:
-        file_path (str): Path to the PDF file.
+        filePath (str): Path to the PDF file.
 
     Returns:
         str: Extracted plaintext or None if the PDF cannot be processed.
     """
-    try:
-        if filePath is None:  # Ensure file path is provided
-            return None
-        
-        # Extract text from the PDF file using pdfminer
-        text = extract_text(filePath)
-        
-        return text.strip() if text else None
-    
-    except Exception as e:
-        handleError(411, e)
-        return None
-
-def parseType(filePath):
-    """
-    Given some file path, parses the type of file and matches to the other.
-    
-    returns:
-        docType   "Resume" or "CoverLetter"
-        nameKey   "name of person" (for dictionary key)
-    """
-    filename = os.path.basename(filePath) 
-    base, _ = os.path.splitext(filename) # unpack tuple to grab full filename 
-    parts = base.split("_", 2) # Splits to ["Type", "First-Last", "GetHired"]
-
-    if len(parts) < 2: # If filename is invalid handle gracefully
-        return ("Unknown", "Unknown")
-    
-    docType = parts[0] # Resume or coverletter
-    nameKey = parts[1] # Name
-
-    if nameKey.count('-') > 1: # If the person has a middle hyphenated name (this took me forever to debug)
-        nameParts = nameKey.split('-') # Split by the -
-        nameKey = f"{nameParts[0]}-{nameParts[-1]}" # Grab first and last entry (first and last names). 
-        # This is not the best solution, i.e for names like Anna o'Keefe it shows it as Anna-O-Keefe which will simplify to Anna Keefe in the program.
-        # I cannot figure out a better one. 
-
-    return docType, nameKey
+    def onError(e):
+        logError(e)
+        root.after(0, lambda: handleError(411, log=False)) # Tk calls must run on the GUI thread
+    return documents.pdfToPlaintext(filePath, onError=onError)
 
-def showLoadingBar(parent=None):
+def showLoadingBar(parent=None, onCancel=None):
     """
     Creates and displays a loading bar window.
 
+    Args:
+        onCancel (callable): Optional, adds a Cancel button (and makes closing the window cancel) that calls this.
+
     Returns:
         Window: The loading bar window.
     """
 
-    loadingWindow = Window("Processing", "300x100", close=False, parent=parent)
+    loadingWindow = Window("Processing", "300x130" if onCancel else "300x100", close=False, parent=parent)
 
     label = tk.Label(loadingWindow, text="Processing...") # Processing text
     label.pack(pady=10) # Add y dir padding to label
@@ -404,6 +505,16 @@ def showLoadingBar(parent=None):
     progress.pack(pady=10, padx=10, fill="x") # Add padding 
     progress.start() # Start loading bar
 
+    if onCancel:
+        def cancel():
+            label.config(text="Cancelling...") # Results finished so far are shown once requests in flight are aborted
+            cancelButton.config(state="disabled")
+            onCancel()
+
+        cancelButton = tk.Button(loadingWindow, text="Cancel", command=cancel)
+        cancelButton.pack(pady=5)
+        loadingWindow.wm_protocol("WM_DELETE_WINDOW", cancel)
+
     def stop():
         progress.stop()
         loadingWindow.destroy()
@@ -411,85 +522,169 @@ def showLoadingBar(parent=None):
     loadingWindow.stop = stop
     return loadingWindow
 
-def showResultWindow(result, file):
+def formatCost(cost):
     """
-    Displays the results of the resume screening process.
-
-    Args:
-        result (list): List of string AI output.
-        file (list): List of tuples of file paths that correspond to each output.
+    Formats an estimated cost, "n/a" for models without a price.
     """
-    global resultWindow
+    return "n/a" if cost is None else f"${cost:.4f}"
 
-    resultWindow = Window("Screening Results", parent=root)
-    
-
-    # Frame to hold listbox and scroller
-    frame = tk.Frame(resultWindow)
-    frame.pack(padx=10, pady=10, fill="both", expand=True)
-
-    # Scrollbar for the listbox
-    scrollbar = tk.Scrollbar(frame, orient="vertical")
-    scrollbar.pack(side="right", fill="y")
-
-    # Listbox to display results
-    resultsListbox = tk.Listbox(frame, width=80, height=10, yscrollcommand=scrollbar.set)
-    resultsListbox.pack(side="left", fill="both", expand=True)
-
-    # Connect scrollbar to listbox
-    scrollbar.config(command=resultsListbox.yview)
-
-    # Dictionary to map previews to detailed content
-    detailsMap = {}
-
-    # List to hold results for sorting
-    results = []
-
-    # Process results and extract information
-    for doctuple, aioutput in zip(file, result):
-        name, resumePath, coverPath = doctuple
-
-        # Extract the score using a regex
-        scorePattern = re.search(r"Score:\s*(\d+)", aioutput)
-        score = int(scorePattern.group(1)) if scorePattern else -1
-
-        # Extract the approval status using a regex
-        appPattern = re.search(r"Rationale:\s*(Approved|Rejected)\.?", aioutput)
-        approval = appPattern.group(1) if appPattern else "Unknown"
+def formatTiers(evaluation):
+    """
+    Formats every cascade tier of an evaluation for the detailed view.
 
-        # Create a preview with the file name, score, and approval status
-        preview = f"{name} | {score} | {approval}"
+    Args:
+        evaluation (dict): Evaluation from ai.evaluate, tiers fast model first.
 
-        # Add to results list
-        results.append((score, preview, aioutput, resumePath, coverPath))
+    Returns:
+        str: Each model's output with its latency and cost, final output first.
+    """
+    sections = []
+    if evaluation.get("duplicateOf"): # Result was reused from a near-duplicate applicant
+        sections.append(f"Duplicate of {evaluation['duplicateOf']}, result reused.")
+    for tier in reversed(evaluation["tiers"]): # Final (strongest) output first
+        header = f"[{tier['model']}] {tier['latency']:.1f}s, {formatCost(tier['cost'])}"
+        sections.append(f"{header}\n{tier['output'].strip()}")
+    return "\n\n".join(sections)
+
+def showResultWindow(store):
+    """
+    Displays the results of the resume screening process, one ranked tab per posting.
 
-    # Sort results by score in descending order
-    results.sort(key=lambda x: x[0], reverse=True)
+    Args:
+        store (pipeline.ResultStore): Screening results indexed by candidate id.
+    """
+    global resultWindow
 
-    # Populate the listbox and details map
-    for score, preview, aioutput, resumePath, coverPath in results:
-        detailsMap[preview] = (aioutput, resumePath, coverPath)  # Include paths in map
-        resultsListbox.insert(tk.END, preview)
+    resultWindow = Window("Screening Results", parent=root)
 
-    # Function to export listbox data to Excel
+    # Controls to re-threshold, cut and re-rank from the recorded scores, no API calls are made
+    controls = tk.Frame(resultWindow)
+    controls.pack(side="top", fill="x", padx=10, pady=(10, 0))
+
+    # Approval is the model's own decision until a threshold is switched on, then it is recomputed from the score
+    useThreshold = tk.BooleanVar(resultWindow, value=False)
+    thresholdBox = tk.Spinbox(controls, from_=0, to=100, width=4)
+    thresholdBox.delete(0, tk.END)
+    thresholdBox.insert(0, str(ai.APPROVALTHRESHOLD))
+    thresholdBox.config(state="disabled")
+    thresholdCheck = tk.Checkbutton(controls, text="Threshold", variable=useThreshold,
+                                    command=lambda: thresholdBox.config(state="normal" if useThreshold.get() else "disabled"))
+    thresholdCheck.pack(side="left")
+    thresholdBox.pack(side="left", padx=(2, 10))
+
+    tk.Label(controls, text="Top").pack(side="left")
+    topEntry = tk.Entry(controls, width=5) # Blank shows everyone
+    topEntry.pack(side="left", padx=(2, 10))
+
+    tk.Label(controls, text="Rank by").pack(side="left")
+    criteriaNames = list(dict.fromkeys(name for posting in store.rows for name in store.criteria(posting)))
+    rankBox = ttk.Combobox(controls, values=["Score"] + criteriaNames, state="readonly", width=20)
+    rankBox.set("Score")
+    rankBox.pack(side="left", padx=(2, 10))
+
+    # One tab per posting
+    notebook = ttk.Notebook(resultWindow)
+    notebook.pack(padx=10, pady=10, fill="both", expand=True)
+
+    # (posting, listbox, candidate id of each row) for every tab
+    tables = []
+
+    # Reads the controls, returns (threshold, top, criterion) for store.ranked
+    def currentView():
+        threshold = None # model's own decision
+        if useThreshold.get():
+            try:
+                threshold = int(thresholdBox.get())
+            except ValueError:
+                messagebox.showinfo("Invalid Threshold", "The threshold must be a whole number, showing the AI's own decisions.")
+        top = int(topEntry.get()) if topEntry.get().strip().isdigit() else None
+        criterion = None if rankBox.get() == "Score" else rankBox.get()
+        return threshold, top, criterion
+
+    # Fills every tab's listbox with a preview of the candidate, score, and approval status, in ranked order
+    def populate():
+        view = currentView()
+        for posting, resultsListbox, rowIds in tables:
+            resultsListbox.delete(0, tk.END)
+            rowIds.clear()
+            for score, approval, candidateId in store.ranked(posting, *view):
+                resultsListbox.insert(tk.END, f"{candidateId} | {score} | {approval}")
+                rowIds.append(candidateId)
+
+    applyButton = tk.Button(controls, text="Apply", command=populate)
+    applyButton.pack(side="left")
+
+    for posting in store.rows:
+        # Frame to hold listbox and scroller
+        frame = tk.Frame(notebook)
+        notebook.add(frame, text=posting)
+
+        # Scrollbar for the listbox
+        scrollbar = tk.Scrollbar(frame, orient="vertical")
+        scrollbar.pack(side="right", fill="y")
+
+        # Listbox to display results
+        resultsListbox = tk.Listbox(frame, width=80, height=10, yscrollcommand=scrollbar.set)
+        resultsListbox.pack(side="left", fill="both", expand=True)
+
+        # Connect scrollbar to listbox
+        scrollbar.config(command=resultsListbox.yview)
+
+        # Candidate id of each listbox row, so identical previews can't collide
+        rowIds = []
+        tables.append((posting, resultsListbox, rowIds))
+
+        # Bind double-click and Enter to show details
+        resultsListbox.bind("<Double-1>", lambda event, p=posting, lb=resultsListbox, ids=rowIds: showDetails(p, lb, ids))
+        resultsListbox.bind("<Return>", lambda event, p=posting, lb=resultsListbox, ids=rowIds: showDetails(p, lb, ids))
+
+    populate()
+
+    # Per-model latency and cost summary for the batch
+    statsText = "   ".join(
+        f"{model}: {entry['calls']} calls (+{entry['requests'] - entry['calls']} hedged), avg {entry['avgLatency']:.1f}s, {formatCost(entry['cost'])}"
+        for model, entry in ai.summarizeTiers(store.allEvaluations()).items()
+    )
+    statsLabel = tk.Label(resultWindow, text=statsText, anchor="w")
+    statsLabel.pack(side="bottom", fill="x", padx=10)
+
+    # Function to export every posting's table to Excel, one sheet per posting
     def export_to_excel():
-        data = []
-        for _, preview, aioutput, _, _ in results:
-            name, scoreStr, approval = preview.split(" | ")
-            rationale = aioutput.strip()
-            data.append([name, scoreStr, approval, rationale]) # Grab all data from output and add to list
-
-        df = pd.DataFrame(data, columns=["Name", "Score", "Approval", "Rationale"]) # Add to excel file using pandas
         savePath = filedialog.asksaveasfilename( # open file dialog to save
             defaultextension=".xlsx",
             filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
         )
-        if savePath: # If the file is saved
-            df.to_excel(savePath, index=False)
-            messagebox.showinfo("Export Successful", f"Results exported to {savePath}")
+        if not savePath: # If the dialog was cancelled
+            return
+
+        usedSheets = set() # Excel sheet names are case-insensitive
+        with pd.ExcelWriter(savePath) as writer:
+            view = currentView() # Export what is shown
+            for posting in store.rows:
+                data = []
+                for score, approval, candidateId in store.ranked(posting, *view):
+                    evaluation = store.evaluations[(posting, candidateId)]
+                    rationale = evaluation["output"].strip()
+                    fastScore = evaluation["tiers"][0]["score"]
+                    model = evaluation["tiers"][-1]["model"]
+                    duplicateOf = evaluation.get("duplicateOf", "")
+                    criteriaScores = "; ".join(f"{name}={value}" for name, value in evaluation.get("criteria", {}).items())
+                    data.append([candidateId, score, approval, rationale, model, fastScore, duplicateOf, criteriaScores]) # Grab all data from output and add to list
+
+                df = pd.DataFrame(data, columns=["Name", "Score", "Approval", "Rationale", "Model", "Fast Score", "Duplicate Of", "Criteria Scores"]) # Add to excel file using pandas
+                baseName = re.sub(r"[\[\]:*?/\\]", "", posting) or "Results" # Excel sheet name rules
+                sheetName, n = baseName[:31], 1
+                while sheetName.lower() in usedSheets: # Postings that clean up to the same name get a suffix instead of overwriting
+                    n += 1
+                    suffix = f" ({n})"
+                    sheetName = baseName[:31 - len(suffix)] + suffix
+                usedSheets.add(sheetName.lower())
+                df.to_excel(writer, sheet_name=sheetName, index=False)
+
+        messagebox.showinfo("Export Successful", f"Results exported to {savePath}")
 
     # Function to show detailed view with buttons
-    def showDetails(event):
+    def showDetails(posting, resultsListbox, rowIds):
         
         # Helper function to open file on button press.
         def openFile(filePath, fileType):
@@ -500,8 +695,9 @@ def showResultWindow(result, file):
 
         selected = resultsListbox.curselection()
         if selected:
-            preview = resultsListbox.get(selected[0]) # get current selected item
-            detailed, resumePath, coverPath = detailsMap.get(preview, ("Details not found.", None, None)) # get details from dictionary
+            candidateId = rowIds[selected[0]] # get current selected candidate
+            detailed = formatTiers(store.evaluations[(posting, candidateId)])
+            _, resumePath, coverPath = store.candidates[candidateId]
 
             # Create a detailed view window
             detailWindow = Window("Detailed Result")
@@ -534,10 +730,6 @@ def showResultWindow(result, file):
     # Add Export button at the bottom-right corner of the main results window
     exportButton = tk.Button(resultWindow, text="Export", command=export_to_excel)
     exportButton.pack(side="bottom", anchor="se", padx=10, pady=10)
-
-    # Bind double-click and Enter to show details
-    resultsListbox.bind("<Double-1>", showDetails)
-    resultsListbox.bind("<Return>", showDetails)
     
 def main():
     """
@@ -563,11 +755,14 @@ def main():
     """
 
     # Allow access to all variables that need to be read in other functions. They are never written in other functions and im too lazy to modify args for pbv.
-    global root, apiKey, listbox, userCriteria, strengthSlider 
+    global root, apiKey, listbox, userCriteria, strengthSlider, postings, postingsLabel, extractionCache
 
     # Check for API key    
     apiKey = checkConfig()
 
+    # Extracts and sanitizes PDFs in the background as they are added
+    extractionCache = pipeline.ExtractionCache(pdfToPlaintext)
+
     root = Window("Brightisle CV Screener", isRoot=True)
 
     # Create a frame around the window to allow widgets to mesh better
@@ -582,6 +777,21 @@ def main():
     userCriteria = tk.Text(frame, width=45, height=8)
     userCriteria.grid(column=0, row=5, padx=5, pady=5, sticky="w")
 
+    # Saved job postings, screened together as a matrix when Run is pressed
+    postings = {}
+    postingsFrame = tk.Frame(frame)
+    postingsFrame.grid(column=0, row=6, padx=5, sticky="w")
+
+    addPostingButton = tk.Button(postingsFrame, text="Add Posting", command=addPosting)
+    addPostingButton.pack(side="left")
+
+    clearPostingsButton = tk.Button(postingsFrame, text="Clear", command=clearPostings)
+    clearPostingsButton.pack(side="left", padx=5)
+
+    postingsLabel = tk.Label(postingsFrame, anchor="w", wraplength=300, justify="left")
+    postingsLabel.pack(side="left")
+    updatePostingsLabel()
+
     # Add a label for the DnD box
     dropLabel = tk.Label(frame, text="Double click to add PDF files")
     dropLabel.grid(column=0, row=2, padx=5, pady=5, sticky="sw")
@@ -616,6 +826,10 @@ def main():
     logButton = tk.Button(frame, text="Log", command=openLog)
     logButton.grid(column=3, row=0, sticky='nw')
 
+    # Add Open button for recorded runs
+    openButton = tk.Button(frame, text="Open Recorded Run", command=openRecording)
+    openButton.grid(column=3, row=1, sticky='ne')
+
     # Configure rows and columns inside the frame
     frame.grid_rowconfigure(0, weight=1)
     frame.grid_rowconfigure(1, weight=1)
@@ -623,6 +837,7 @@ def main():
     frame.grid_rowconfigure(3, weight=0)
     frame.grid_rowconfigure(4, weight=0)
     frame.grid_rowconfigure(5, weight=0)
+    frame.grid_rowconfigure(6, weight=0)
     frame.grid_columnconfigure(0, weight=1)
     frame.grid_columnconfigure(1, weight=1)
     frame.grid_columnconfigure(2, weight=0)
@@ -0,0 +1,425 @@
+import queue
+import threading
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import ai
+import dedupe
+
+
+PREFETCH = 4 # Candidates extracted ahead of the evaluator, bounds how many raw texts are held at once
+PREEXTRACTWORKERS = 2 # Threads extracting files in the background as they are added to the dropbox
+PRECACHELIMIT = 200 # Files held pre-extracted at once, the rest are extracted during the run with the PREFETCH bound
+
+
+class _Failure:
+    # Carries an exception from the extraction thread to the consumer
+    def __init__(self, error):
+        self.error = error
+
+_DONE = object()
+
+
+def discover(pairs):
+    """
+    Yields a candidate for every entry from gatherPairs that has at least one file.
+
+    Args:
+        pairs (dict): Candidate key -> {"Name", "Resume", "CoverLetter", ...}.
+
+    Yields:
+        dict: {"id", "name", "resumePath", "coverPath"}
+    """
+    for candidateId, docs in pairs.items():
+        if not docs.get("Resume") and not docs.get("CoverLetter"): # if both are somehow missing, skip the entry
+            continue
+        yield {
+            "id": candidateId,
+            "name": docs["Name"],
+            "resumePath": docs.get("Resume"),
+            "coverPath": docs.get("CoverLetter"),
+        }
+
+def extract(candidates, extractor, prefetch=PREFETCH, cache=None):
+    """
+    Extracts PDF text on a background thread, at most prefetch candidates ahead.
+
+    The bounded buffer is the backpressure: when the evaluator falls behind,
+    extraction blocks instead of piling up texts in memory. Candidates whose
+    files are all in the cache use the already sanitized texts and are marked
+    so sanitize() passes them through.
+
+    Args:
+        candidates (iterable): Candidates from discover().
+        extractor (callable): Path -> plaintext or None.
+        prefetch (int): Buffer size.
+        cache (ExtractionCache): Optional, texts extracted in the background.
+
+    Yields:
+        dict: Candidate with "resumeText" and "coverText" added.
+    """
+    buffer = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set(): # give up if the consumer went away
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for candidate in candidates:
+                paths = (candidate["resumePath"], candidate["coverPath"])
+                if cache is not None and all(cache.has(path) for path in paths if path):
+                    candidate = dict(candidate, resumeText=cache.get(paths[0]), coverText=cache.get(paths[1]), sanitized=True)
+                else: # not pre-extracted, extract here so misses still run ahead of the evaluator
+                    candidate = dict(candidate, resumeText=extractor(paths[0]), coverText=extractor(paths[1]))
+                if not put(candidate):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+def sanitize(candidates):
+    """
+    Replaces the raw texts with sanitized ones, skipping candidates with no usable text.
+
+    Yields:
+        dict: Candidate with sanitized "resumeText" and "coverText".
+    """
+    for candidate in candidates:
+        resumeText, coverText = candidate["resumeText"], candidate["coverText"]
+        if (not resumeText or resumeText.strip() == "") and (not coverText or coverText.strip() == ""): # Ensure plaintext is not falsy
+            continue
+
+        if candidate.pop("sanitized", False): # already sanitized by the ExtractionCache
+            candidate["resumeText"] = resumeText or "None"
+            candidate["coverText"] = coverText or "None"
+            yield candidate
+            continue
+
+        try:
+            candidate["resumeText"] = ai.sanitizeText(resumeText, candidate["name"])
+            candidate["coverText"] = ai.sanitizeText(coverText, candidate["name"])
+        except ValueError as e: # name without a hyphen can't be sanitized, never send it unsanitized
+            ai.logError(e)
+            continue
+        yield candidate
+
+def evaluate(candidates, profiles, evaluator, cancel=None):
+    """
+    Evaluates each candidate against every posting and drops its texts.
+
+    Near-duplicates of an earlier candidate reuse its evaluations instead of
+    calling the evaluator. Once cancel is set no further evaluations are
+    started, and a candidate cut short by ai.Cancelled is still yielded with
+    the postings it finished.
+
+    Args:
+        candidates (iterable): Candidates from sanitize().
+        profiles (dict): Posting name -> {"criteria", "strength"}.
+        evaluator (callable): (resume, cover, name, criteria, strength) -> evaluation or None.
+        cancel (threading.Event): Optional, stops dispatching when set.
+
+    Yields:
+        dict: {"id", "name", "resumePath", "coverPath", "evaluations": {posting: evaluation}}
+    """
+    duplicates = dedupe.DuplicateIndex() # Same applicant from several sources or name spellings
+    screened = {} # candidate id -> {posting: evaluation}, for reuse by duplicates
+
+    for candidate in candidates:
+        if cancel is not None and cancel.is_set():
+            return
+
+        resumeText = candidate.pop("resumeText")
+        coverText = candidate.pop("coverText")
+        representative = duplicates.add(candidate["id"], f"{resumeText}\n{coverText}")
+
+        evaluations = {}
+        cancelled = False
+        for posting, profile in profiles.items(): # One row of the candidates x postings matrix
+            if posting in screened.get(representative, {}): # Screen one representative, attach its result to the rest
+                evaluations[posting] = dict(screened[representative][posting], duplicateOf=representative)
+                continue
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+                break
+            try:
+                evaluation = evaluator(resumeText, coverText, candidate["name"], profile["criteria"], profile["strength"])
+            except ai.Cancelled:
+                cancelled = True
+                break
+            if evaluation is not None:
+                evaluations[posting] = evaluation
+
+        del resumeText, coverText # Raw texts are not needed past this point
+        if representative is None:
+            screened[candidate["id"]] = evaluations
+        if evaluations:
+            candidate["evaluations"] = evaluations
+            yield candidate
+        if cancelled:
+            return
+
+def queueJobs(candidates, queue, batch, profiles, cancel=None):
+    """
+    Queues one job per candidate with every posting, for worker.py to screen.
+
+    The texts are only used to find near-duplicates of an earlier
+    candidate, those are not queued and the caller attaches the
+    representative's results once its job is done. Workers extract each
+    queued candidate's PDFs themselves, so the jobs stay small.
+
+    Args:
+        candidates (iterable): Candidates from sanitize().
+        queue (jobqueue.JobQueue): Queue to add the jobs to.
+        batch (str): Batch id of the run.
+        profiles (dict): Posting name -> {"criteria", "strength"}.
+        cancel (threading.Event): Optional, stops queueing when set.
+
+    Returns:
+        list: (candidate, representative id) for every duplicate that was not queued.
+    """
+    duplicates = dedupe.DuplicateIndex()
+    skipped = []
+
+    for candidate in candidates:
+        if cancel is not None and cancel.is_set():
+            break
+
+        representative = duplicates.add(candidate["id"], f"{candidate.pop('resumeText')}\n{candidate.pop('coverText')}")
+        if representative is not None:
+            skipped.append((candidate, representative))
+            continue
+
+        queue.enqueue({
+            "candidate": candidate["id"],
+            "name": candidate["name"],
+            "resumePath": candidate["resumePath"],
+            "coverPath": candidate["coverPath"],
+            "profiles": profiles,
+        }, batch)
+
+    return skipped
+
+def screen(pairs, profiles, extractor, evaluator, prefetch=PREFETCH, cancel=None, cache=None):
+    """
+    Chains discover -> extract -> sanitize -> evaluate.
+
+    With a cache, texts extracted in the background are used where
+    available and the rest go through the extract and sanitize stages.
+
+    Yields:
+        dict: Evaluated candidates, see evaluate().
+    """
+    prepared = sanitize(extract(discover(pairs), extractor, prefetch, cache))
+    return evaluate(prepared, profiles, evaluator, cancel)
+
+
+class ExtractionCache:
+    """
+    Extracts and sanitizes PDFs in the background as soon as they are added.
+
+    Each file's sanitized text is held until the file is removed from the
+    dropbox, so by the time Run is pressed (and on every later run) the
+    remaining work is mostly API calls. At most limit files are held, files
+    added past that are extracted during the run by extract() instead.
+    """
+
+    def __init__(self, extractor, workers=PREEXTRACTWORKERS, limit=PRECACHELIMIT):
+        self.extractor = extractor
+        self.limit = limit
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preextract")
+        self.futures = {} # path -> Future of sanitized text (or None)
+        self.lock = threading.Lock()
+
+    def prepare(self, path, name):
+        """
+        Extracts and sanitizes one file.
+
+        Returns:
+            str: Sanitized text, or None if there is no usable text.
+        """
+        text = self.extractor(path)
+        if not text or text.strip() == "":
+            return None
+        try:
+            return ai.sanitizeText(text, name)
+        except ValueError as e: # name without a hyphen can't be sanitized, never send it unsanitized
+            ai.logError(e)
+            return None
+
+    def schedule(self, path, name):
+        """
+        Starts extracting a file in the background, unless it already is or the cache is full.
+        """
+        with self.lock:
+            if path not in self.futures and len(self.futures) < self.limit:
+                self.futures[path] = self.executor.submit(self.prepare, path, name)
+
+    def cancel(self, path):
+        """
+        Drops a file, cancelling its extraction if it hasn't started.
+        """
+        with self.lock:
+            future = self.futures.pop(path, None)
+        if future is not None:
+            future.cancel()
+
+    def has(self, path):
+        """
+        Returns True if a file was scheduled and not cancelled.
+        """
+        with self.lock:
+            future = self.futures.get(path)
+        return future is not None and not future.cancelled()
+
+    def get(self, path):
+        """
+        Returns a file's sanitized text, waiting for the background extraction if needed.
+        The entry is kept so later runs reuse it.
+
+        Returns:
+            str: Sanitized text, or None if there is no usable text or the file was not scheduled.
+        """
+        if path is None:
+            return None
+        with self.lock:
+            future = self.futures.get(path)
+        if future is None or future.cancelled():
+            return None
+        return future.result()
+
+    def shutdown(self):
+        """
+        Cancels pending extractions so the app can exit.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ResultStore:
+    """
+    Sink for screening results, indexed by candidate id.
+
+    Keeps each candidate's paths once and per posting only the parsed score,
+    approval and evaluation, so nothing is duplicated between the results
+    table and the detailed view. A store can be saved after a run and loaded
+    later to re-threshold, re-rank and export without calling the API.
+    """
+
+    def __init__(self, postings):
+        self.candidates = {} # candidate id -> (name, resumePath, coverPath)
+        self.rows = {posting: [] for posting in postings} # posting -> [(score, approval, candidate id)]
+        self.evaluations = {} # (posting, candidate id) -> evaluation
+
+    def add(self, record):
+        """
+        Adds an evaluated candidate from evaluate().
+        """
+        for posting, evaluation in record["evaluations"].items():
+            self.addEvaluation(posting, record["id"], record["name"], record["resumePath"], record["coverPath"], evaluation)
+
+    def addEvaluation(self, posting, candidateId, name, resumePath, coverPath, evaluation):
+        """
+        Adds a single posting's evaluation of a candidate.
+        """
+        self.candidates[candidateId] = (name, resumePath, coverPath)
+        self.rows.setdefault(posting, []).append((ai.parseScore(evaluation["output"]), ai.parseApproval(evaluation["output"]), candidateId))
+        self.evaluations[(posting, candidateId)] = evaluation
+
+    def ranked(self, posting, threshold=None, top=None, criterion=None):
+        """
+        Returns a posting's rows sorted in descending order.
+
+        Args:
+            posting (str): Posting name.
+            threshold (int): Optional, recomputes approval as score >= threshold instead of the model's decision.
+            top (int): Optional, keeps only the first top rows.
+            criterion (str): Optional, ranks by this criterion's score (then overall score) instead of overall score.
+
+        Returns:
+            list: (score, approval, candidate id) tuples.
+        """
+        rows = self.rows[posting]
+        if threshold is not None:
+            rows = [(score, ("Approved" if score >= threshold else "Rejected") if score >= 0 else "Unknown", candidateId)
+                    for score, _, candidateId in rows]
+
+        if criterion:
+            key = lambda row: (self.evaluations[(posting, row[2])].get("criteria", {}).get(criterion, -1), row[0])
+        else:
+            key = lambda row: row[0]
+        rows = sorted(rows, key=key, reverse=True)
+        return rows[:top] if top else rows
+
+    def criteria(self, posting):
+        """
+        Returns the criterion names scored for a posting, in the order the user listed them.
+        """
+        names = {}
+        for (evaluationPosting, _), evaluation in self.evaluations.items():
+            if evaluationPosting == posting:
+                names.update(dict.fromkeys(evaluation.get("criteria", {})))
+        return list(names)
+
+    def allEvaluations(self):
+        """
+        Returns every stored evaluation.
+        """
+        return list(self.evaluations.values())
+
+    def save(self, path, profiles):
+        """
+        Writes the store to a JSON lines file, one line per evaluation after a header with the profiles.
+
+        Args:
+            path (str): File to write.
+            profiles (dict): Posting name -> {"criteria", "strength"} used for the run.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"type": "run", "time": time.time(), "profiles": profiles}) + "\n")
+            for (posting, candidateId), evaluation in self.evaluations.items():
+                name, resumePath, coverPath = self.candidates[candidateId]
+                file.write(json.dumps({
+                    "type": "evaluation",
+                    "posting": posting,
+                    "candidate": candidateId,
+                    "name": name,
+                    "resumePath": resumePath,
+                    "coverPath": coverPath,
+                    "evaluation": evaluation,
+                }) + "\n")
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a store written by save().
+
+        Returns:
+            tuple: (ResultStore, profiles)
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            lines = [json.loads(line) for line in file if line.strip()]
+
+        profiles = next((line["profiles"] for line in lines if line["type"] == "run"), {})
+        store = cls(profiles)
+        for line in lines:
+            if line["type"] == "evaluation":
+                store.addEvaluation(line["posting"], line["candidate"], line["name"], line["resumePath"], line["coverPath"], line["evaluation"])
+        return store, profiles
@@ -0,0 +1,18 @@
+import os
+import sys
+import pytest
+
+# The app modules live at the repo root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai
+
+
+@pytest.fixture(autouse=True)
+def logFile(tmp_path, monkeypatch):
+    """
+    Sends ai.logError to a temporary file instead of the user's app data folder.
+    """
+    path = tmp_path / "log.txt"
+    monkeypatch.setattr(ai, "LOGFILE", str(path))
+    return path
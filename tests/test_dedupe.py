@@ -0,0 +1,53 @@
+import random
+
+import dedupe
+
+
+def words(seed, count=200):
+    rng = random.Random(seed)
+    return [f"w{rng.randint(0, 10 ** 6)}" for _ in range(count)]
+
+def edited(text, positions):
+    edit = text.split()
+    for position in positions:
+        edit[position] = f"changed{position}"
+    return " ".join(edit)
+
+
+def test_sameResumeFromAnotherSourceIsMatched():
+    index = dedupe.DuplicateIndex()
+    resume = " ".join(words(1))
+
+    assert index.add("Ann-Lee_Indeed", resume) is None
+    assert index.add("Ben-Ray_Indeed", " ".join(words(2))) is None
+    assert index.add("Ann-Lee_Seek", edited(resume, [10, 60])) == "Ann-Lee_Indeed"
+
+def test_shortTextsAreNeverMatched():
+    index = dedupe.DuplicateIndex()
+
+    assert index.add("Al-X", "Thank you\nNone") is None
+    assert index.add("Zed-Y", "Thank you\nNone") is None
+
+    boilerplate = "Dear hiring manager, I am [FIRST] [LAST] and I am applying for this role. Reach me at [EMAIL] or [PHONE]. Thank you for your time."
+    assert len(dedupe.shingles(boilerplate)) < dedupe.MINSHINGLES
+    assert index.add("Al-X_Seek", boilerplate) is None
+    assert index.add("Zed-Y_Seek", boilerplate) is None
+
+def test_textShorterThanShingleHasNoShingles():
+    assert dedupe.shingles("Thank you") == set()
+    assert dedupe.signature("Thank you") is None
+
+def test_matchesOnlyRepresentatives():
+    first = " ".join(words(3))
+    second = edited(first, range(10, 200, 50))
+    third = edited(second, range(35, 200, 50))
+    signature = dedupe.signature
+    assert dedupe.similarity(signature(first), signature(second)) >= dedupe.THRESHOLD
+    assert dedupe.similarity(signature(second), signature(third)) >= dedupe.THRESHOLD
+    assert dedupe.similarity(signature(first), signature(third)) < dedupe.THRESHOLD
+
+    index = dedupe.DuplicateIndex()
+    assert index.add("first", first) is None
+    assert index.add("second", second) == "first"
+    assert index.add("third", third) is None # close to second, but second is not a representative
+    assert index.add("fourth", third) == "third"
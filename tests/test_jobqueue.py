@@ -0,0 +1,80 @@
+import time
+import pytest
+
+import jobqueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return jobqueue.openQueue(str(tmp_path / "queue.db"))
+
+
+def test_leaseIsExclusiveUntilItExpires(queue):
+    jobId = queue.enqueue({"name": "Ann-Lee"})
+
+    assert queue.lease("a", visibility=0.2)[:2] == (jobId, {"name": "Ann-Lee"})
+    assert queue.lease("b", visibility=0.2) is None # still leased by a
+
+    time.sleep(0.3)
+    assert queue.lease("b", visibility=60) == (jobId, {"name": "Ann-Lee"}, 2) # expired, retried with a second attempt
+
+def test_staleWorkerCannotFinishJob(queue):
+    jobId = queue.enqueue({"name": "Ann-Lee"}, "batch")
+    queue.lease("a", visibility=0.1)
+    time.sleep(0.2)
+    queue.lease("b", visibility=60)
+
+    assert not queue.extend(jobId, "a")
+    assert not queue.complete(jobId, "a", {"evaluation": "stale"})
+    assert not queue.fail(jobId, "a", "stale")
+    assert queue.complete(jobId, "b", {"evaluation": "fresh"})
+
+    job, = queue.batchStatus("batch")
+    assert (job["state"], job["result"]) == ("done", {"evaluation": "fresh"})
+
+def test_failRetriesUntilMaxAttempts(queue):
+    jobId = queue.enqueue({"name": "Ann-Lee"}, "batch")
+
+    for attempt in range(1, jobqueue.DEFAULTMAXATTEMPTS + 1):
+        assert queue.lease("a") == (jobId, {"name": "Ann-Lee"}, attempt)
+        assert queue.fail(jobId, "a", f"error {attempt}")
+
+    assert queue.lease("a") is None
+    job, = queue.batchStatus("batch")
+    assert (job["state"], job["error"]) == ("failed", f"error {jobqueue.DEFAULTMAXATTEMPTS}")
+
+def test_leaseExpiringOnFinalAttemptFailsJob(tmp_path):
+    queue = jobqueue.SQLiteJobQueue(str(tmp_path / "queue.db"), maxAttempts=1)
+    queue.enqueue({"name": "Ann-Lee"}, "batch")
+    queue.lease("a", visibility=0.1)
+    time.sleep(0.2)
+
+    assert queue.lease("b") is None # crashed on its only attempt, not handed out again
+    assert queue.batchStatus("batch")[0]["state"] == "failed"
+
+def test_cancelBatchOnlyWithdrawsPendingJobs(queue):
+    leased = queue.enqueue({"name": "Ann-Lee"}, "batch")
+    pending = queue.enqueue({"name": "Ben-Ray"}, "batch")
+    other = queue.enqueue({"name": "Cal-Fox"}, "other")
+    queue.lease("a")
+
+    queue.cancelBatch("batch")
+
+    assert {job["id"]: job["state"] for job in queue.batchStatus("batch")} == {leased: "leased", pending: "cancelled"}
+    assert queue.lease("a")[0] == other # cancelled jobs are never leased
+    assert queue.complete(leased, "a", {}) # already running jobs still finish
+
+def test_batchCounts(queue):
+    first = queue.enqueue({"name": "Ann-Lee"}, "batch")
+    queue.enqueue({"name": "Ben-Ray"}, "batch")
+    queue.enqueue({"name": "Cal-Fox"}, "other")
+    queue.lease("a")
+    queue.complete(first, "a", {})
+
+    assert queue.batchCounts("batch") == {"done": 1, "pending": 1}
+    assert queue.batchCounts("missing") == {}
+
+def test_openQueue(tmp_path):
+    assert isinstance(jobqueue.openQueue(f"sqlite://{tmp_path / 'queue.db'}"), jobqueue.SQLiteJobQueue)
+    with pytest.raises(ValueError):
+        jobqueue.openQueue("redis://localhost")
@@ -0,0 +1,208 @@
+import random
+import threading
+import time
+import pytest
+
+import ai
+import pipeline
+
+
+PROFILES = {"Backend": {"criteria": "Python", "strength": "3"}, "Data": {"criteria": "SQL", "strength": "3"}}
+
+
+def makePairs(count):
+    return {f"P{n}-X_Seek": {"Name": f"P{n}-X", "Source": "Seek", "Resume": f"Resume_P{n}-X_Seek.pdf", "CoverLetter": None} for n in range(count)}
+
+def resumeText(path):
+    if path is None:
+        return None
+    rng = random.Random(path) # different applicant per file, long enough to be deduplicated
+    return " ".join(f"w{rng.randint(0, 10 ** 6)}" for _ in range(100))
+
+def approve(resume, cover, name, criteria, strength):
+    return {"output": f"Score: 70 Rationale: Approved. {criteria}", "tiers": []}
+
+
+def test_extractStaysWithinPrefetch():
+    extracted = []
+    leads = []
+
+    def extractor(path):
+        if path is not None:
+            extracted.append(path)
+        return resumeText(path)
+
+    def evaluator(*args):
+        leads.append(len(extracted) - len(leads) - 1) # candidates extracted beyond the one being evaluated
+        time.sleep(0.01) # slower than extraction, so the producer has to wait
+        return approve(*args)
+
+    records = list(pipeline.screen(makePairs(20), {"Backend": PROFILES["Backend"]}, extractor, evaluator, prefetch=3))
+
+    assert len(records) == 20
+    assert max(leads) <= 3 + 1 # the buffer plus the one the producer is waiting to put
+    assert max(leads) >= 3 # and it did read ahead
+
+def test_extractStopsWhenConsumerStops():
+    extracted = []
+    candidates = pipeline.extract(pipeline.discover(makePairs(50)), lambda path: extracted.append(path) or resumeText(path), prefetch=2)
+
+    next(candidates)
+    next(candidates)
+    candidates.close() # the consumer gives up, e.g. the run was cancelled
+    time.sleep(0.3)
+    count = len(extracted)
+    time.sleep(0.3)
+
+    assert len(extracted) == count # the producer stopped
+    assert count <= 2 * (2 + 2 + 1) # two paths per candidate, nowhere near all 50 candidates
+
+def test_extractRaisesProducerErrors():
+    def extractor(path):
+        if path == "Resume_P2-X_Seek.pdf":
+            raise OSError("unreadable")
+        return resumeText(path)
+
+    candidates = pipeline.extract(pipeline.discover(makePairs(5)), extractor)
+    assert [candidate["id"] for candidate in [next(candidates), next(candidates)]] == ["P0-X_Seek", "P1-X_Seek"]
+    with pytest.raises(OSError):
+        next(candidates)
+
+def test_sanitizeSkipsEmptyAndRemovesNames():
+    candidates = [
+        {"id": "a", "name": "Ann-Lee", "resumeText": "Ann Lee, al1990@example.com", "coverText": None},
+        {"id": "b", "name": "Ben-Ray", "resumeText": "  ", "coverText": None},
+        {"id": "c", "name": "Cal", "resumeText": "no hyphen in the name", "coverText": None},
+    ]
+    sanitized = list(pipeline.sanitize(candidates))
+
+    assert [candidate["id"] for candidate in sanitized] == ["a"]
+    assert sanitized[0]["resumeText"] == "[FIRST] [LAST], [EMAIL]"
+
+def test_evaluateCancelMidCandidate():
+    calls = []
+
+    def evaluator(resume, cover, name, criteria, strength):
+        calls.append((name, criteria))
+        if len(calls) == 4: # second posting of the second candidate
+            raise ai.Cancelled()
+        return approve(resume, cover, name, criteria, strength)
+
+    records = list(pipeline.screen(makePairs(5), PROFILES, resumeText, evaluator))
+
+    assert [(record["id"], sorted(record["evaluations"])) for record in records] == [("P0-X_Seek", ["Backend", "Data"]), ("P1-X_Seek", ["Backend"])]
+    assert len(calls) == 4 # nothing dispatched after the cancel
+
+def test_evaluateStopsDispatchingOnceCancelled():
+    cancel = threading.Event()
+
+    def evaluator(*args):
+        cancel.set()
+        return approve(*args)
+
+    records = list(pipeline.screen(makePairs(5), PROFILES, resumeText, evaluator, cancel=cancel))
+
+    assert [(record["id"], sorted(record["evaluations"])) for record in records] == [("P0-X_Seek", ["Backend"])]
+
+def test_duplicateReusesResult():
+    pairs = makePairs(2)
+    pairs["P0-X_Indeed"] = dict(pairs["P0-X_Seek"], Source="Indeed") # same resume from another job board
+    calls = []
+
+    records = list(pipeline.screen(pairs, PROFILES, resumeText, lambda *args: calls.append(args) or approve(*args)))
+
+    assert len(calls) == 2 * len(PROFILES)
+    assert {posting: evaluation["duplicateOf"] for posting, evaluation in records[-1]["evaluations"].items()} == {"Backend": "P0-X_Seek", "Data": "P0-X_Seek"}
+
+def test_shortTextsAreScreenedSeparately():
+    pairs = {name: {"Name": name, "Resume": f"Resume_{name}.pdf", "CoverLetter": None} for name in ("Al-X", "Zed-Y")}
+    calls = []
+
+    records = list(pipeline.screen(pairs, {"Backend": PROFILES["Backend"]}, lambda path: "Thank you", lambda *args: calls.append(args[2]) or approve(*args)))
+
+    assert calls == ["Al-X", "Zed-Y"]
+    assert not any(record["evaluations"]["Backend"].get("duplicateOf") for record in records)
+
+def test_resultStoreKeepsRowsApartWithIdenticalPreviews():
+    store = pipeline.ResultStore(PROFILES)
+    evaluation = approve(None, None, None, "Python", "3")
+    for source in ("Seek", "Indeed"): # same name and the same output, only the id differs
+        store.add({"id": f"Ann-Lee_{source}", "name": "Ann-Lee", "resumePath": f"Resume_Ann-Lee_{source}.pdf", "coverPath": None, "evaluations": {"Backend": dict(evaluation)}})
+
+    rows = store.ranked("Backend")
+
+    assert sorted(row[2] for row in rows) == ["Ann-Lee_Indeed", "Ann-Lee_Seek"]
+    assert [store.candidates[row[2]][1] for row in rows] == [f"Resume_{row[2]}.pdf" for row in rows]
+    assert store.evaluations[("Backend", "Ann-Lee_Seek")] is not store.evaluations[("Backend", "Ann-Lee_Indeed")]
+
+
+def test_cacheKeepsSanitizedTextForEveryRun():
+    extracted = []
+    cache = pipeline.ExtractionCache(lambda path: extracted.append(path) or "Ann Lee knows Python")
+    cache.schedule("Resume_Ann-Lee.pdf", "Ann-Lee")
+
+    assert cache.get("Resume_Ann-Lee.pdf") == "[FIRST] [LAST] knows Python"
+    assert cache.get("Resume_Ann-Lee.pdf") == "[FIRST] [LAST] knows Python" # not consumed by the first run
+    assert extracted == ["Resume_Ann-Lee.pdf"]
+    assert cache.get("Resume_Unknown.pdf") is None and not cache.has("Resume_Unknown.pdf")
+    cache.shutdown()
+
+def test_cacheCancelDropsFile():
+    release = threading.Event()
+    extracted = []
+
+    def extractor(path):
+        release.wait(5)
+        extracted.append(path)
+        return resumeText(path)
+
+    cache = pipeline.ExtractionCache(extractor, workers=1)
+    cache.schedule("first.pdf", "Ann-Lee") # keeps the only worker busy
+    cache.schedule("second.pdf", "Ben-Ray")
+    cache.cancel("second.pdf") # removed from the dropbox before it started
+    release.set()
+
+    assert cache.get("first.pdf") is not None
+    assert not cache.has("second.pdf") and cache.get("second.pdf") is None
+    time.sleep(0.05)
+    assert extracted == ["first.pdf"]
+    cache.shutdown()
+
+def test_cacheLimit():
+    cache = pipeline.ExtractionCache(resumeText, limit=2)
+    for path in ("a.pdf", "b.pdf", "c.pdf"):
+        cache.schedule(path, "Ann-Lee")
+
+    assert [cache.has(path) for path in ("a.pdf", "b.pdf", "c.pdf")] == [True, True, False]
+    cache.cancel("a.pdf")
+    cache.schedule("c.pdf", "Ann-Lee") # room again
+    assert cache.has("c.pdf")
+    cache.shutdown()
+
+def test_cacheSkipsNamesItCannotSanitize(logFile):
+    cache = pipeline.ExtractionCache(resumeText)
+    assert cache.prepare("a.pdf", "Cal") is None # never sent unsanitized
+    assert "Error" in logFile.read_text()
+
+def test_screenUsesCacheAndExtractsMisses():
+    pairs = makePairs(6)
+    workers = []
+
+    def extractor(path):
+        if path is not None:
+            workers.append((threading.current_thread().name.startswith("preextract"), path))
+        return resumeText(path)
+
+    cache = pipeline.ExtractionCache(extractor, limit=3)
+    for docs in pairs.values():
+        cache.schedule(docs["Resume"], docs["Name"])
+
+    for run in range(2):
+        records = list(pipeline.screen(pairs, PROFILES, extractor, approve, cache=cache))
+        assert len(records) == 6
+
+    background = sorted(path for preextracted, path in workers if preextracted)
+    duringRun = [path for preextracted, path in workers if not preextracted]
+    assert background == [f"Resume_P{n}-X_Seek.pdf" for n in range(3)] # once, reused by the second run
+    assert duringRun == [f"Resume_P{n}-X_Seek.pdf" for n in range(3, 6)] * 2 # misses go through extract()
+    cache.shutdown()
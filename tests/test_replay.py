@@ -0,0 +1,108 @@
+import json
+import os
+import pytest
+
+import ai
+import pipeline
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CRITERIA = "Python experience; SQL skills"
+PROFILES = {"Backend": {"criteria": CRITERIA, "strength": "3"}, "Data": {"criteria": "SQL skills", "strength": "2"}}
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    """
+    Points ai at a replay-only config using the committed cassette, with no API key.
+    """
+    config = {"CASSETTE_MODE": "replay", "CASSETTE_FILE": os.path.join(FIXTURES, "cassette.jsonl")}
+    configFile = tmp_path / "config.json"
+    configFile.write_text(json.dumps(config))
+    monkeypatch.setattr(ai, "CONFIGFILE", str(configFile))
+    monkeypatch.setattr(ai, "_cassettes", {})
+    return tmp_path
+
+def evaluation(score, python, sql):
+    output = f"Score: {score} Rationale: {'Approved' if score >= 65 else 'Rejected'}. Test. Criteria: C1={python}; C2={sql}"
+    return {"output": output, "tiers": [], "criteria": ai.parseCriteria(output, CRITERIA)}
+
+def makeStore():
+    store = pipeline.ResultStore(PROFILES)
+    for candidateId, score, python, sql in [("Ann-Lee", 80, 9, 4), ("Ben-Ray", 70, 5, 9), ("Cal-Fox", 60, 8, 8), ("Dee-Orr", 40, 2, 2)]:
+        store.add({
+            "id": candidateId,
+            "name": candidateId,
+            "resumePath": f"Resume_{candidateId}.pdf",
+            "coverPath": None,
+            "evaluations": {"Backend": evaluation(score, python, sql)},
+        })
+    return store
+
+
+def test_replayFastModelOnly(replay):
+    result = ai.evaluate("Alice-Smith", "Alice resume: 6 years of Python and PostgreSQL.", "None", CRITERIA, "3", sanitized=True)
+
+    assert [tier["model"] for tier in result["tiers"]] == ["gpt-4o-mini"] # 90 is outside the band, not escalated
+    assert ai.parseScore(result["output"]) == 90
+    assert result["criteria"] == {"Python experience": 9, "SQL skills": 7}
+    assert result["tiers"][0]["latency"] == 1.2 # recorded latency, not measured
+
+def test_replayEscalatesBorderline(replay):
+    result = ai.evaluate("Bob-Jones", "Bob resume: Python scripting, some Excel.", "Bob coverletter: keen to learn SQL.", CRITERIA, "3", sanitized=True)
+
+    assert [tier["model"] for tier in result["tiers"]] == ["gpt-4o-mini", "gpt-4o"]
+    assert ai.parseScore(result["output"]) == 70
+    assert ai.parseApproval(result["output"]) == "Approved"
+    assert result["criteria"] == {"Python experience": 7, "SQL skills": 4}
+
+def test_replayMissSkipsApplicant(replay, logFile):
+    assert ai.evaluate("Carol-White", "Carol resume: never recorded.", "None", CRITERIA, "3", sanitized=True) is None
+    assert "No recording" in logFile.read_text()
+
+def test_splitCriteria():
+    assert ai.splitCriteria("Python experience; SQL skills") == ["Python experience", "SQL skills"]
+    assert ai.splitCriteria("1. Python\n- SQL, Postgres\n\n* Team work;") == ["Python", "SQL, Postgres", "Team work"]
+    assert ai.splitCriteria("") == []
+
+def test_promptNumbersCriteria():
+    prompt = ai.buildPrompt("resume", "cover", CRITERIA, "3")
+    assert "C1: Python experience" in prompt and "C2: SQL skills" in prompt
+
+def test_parseCriteriaUsesTheUsersNames():
+    assert ai.parseCriteria("Score: 50 Rationale: Rejected. No criteria section.", CRITERIA) == {}
+    assert ai.parseCriteria("Score: 70 Rationale: Approved. Fine. Criteria: C2=8; C1 = 6;", CRITERIA) == {"Python experience": 6, "SQL skills": 8}
+    assert ai.parseCriteria("Score: 70 Rationale: Approved. Meets the Criteria: mostly.\nCriteria:\n- C1: 3\n- C7=10", CRITERIA) == {"Python experience": 3}
+    assert ai.parseCriteria("Score: 70 Rationale: Approved. Criteria: Python=8; SQL=6", CRITERIA) == {} # made-up names are not trusted
+
+def test_rankedThresholdTopCriterion():
+    store = makeStore()
+
+    assert [row[2] for row in store.ranked("Backend")] == ["Ann-Lee", "Ben-Ray", "Cal-Fox", "Dee-Orr"]
+    assert [row[1] for row in store.ranked("Backend", threshold=60)] == ["Approved", "Approved", "Approved", "Rejected"]
+    assert [row[2] for row in store.ranked("Backend", top=2)] == ["Ann-Lee", "Ben-Ray"]
+    assert [row[2] for row in store.ranked("Backend", criterion="SQL skills")] == ["Ben-Ray", "Cal-Fox", "Ann-Lee", "Dee-Orr"]
+    assert [row[2] for row in store.ranked("Backend", threshold=75, top=1, criterion="Python experience")] == ["Ann-Lee"]
+    assert store.ranked("Data") == []
+    assert store.criteria("Backend") == ["Python experience", "SQL skills"]
+
+def test_saveLoadRoundTrip(tmp_path):
+    store = makeStore()
+    path = str(tmp_path / "run.jsonl")
+    store.save(path, PROFILES)
+
+    loaded, profiles = pipeline.ResultStore.load(path)
+
+    assert profiles == PROFILES
+    assert loaded.candidates == store.candidates
+    assert loaded.evaluations == store.evaluations
+    assert loaded.ranked("Backend", threshold=65, criterion="SQL skills") == store.ranked("Backend", threshold=65, criterion="SQL skills")
+    assert loaded.ranked("Data") == []
+
+def test_thresholdAlwaysRecomputesApproval():
+    store = pipeline.ResultStore(PROFILES)
+    output = "Score: 70 Rationale: Rejected. The model disagreed with its own score. Criteria: C1=5; C2=5"
+    store.add({"id": "Ann-Lee", "name": "Ann-Lee", "resumePath": None, "coverPath": None, "evaluations": {"Backend": {"output": output, "tiers": [], "criteria": {}}}})
+
+    assert store.ranked("Backend")[0][1] == "Rejected" # model's own decision
+    assert [store.ranked("Backend", threshold=threshold)[0][1] for threshold in (ai.APPROVALTHRESHOLD - 1, ai.APPROVALTHRESHOLD, ai.APPROVALTHRESHOLD + 1)] == ["Approved"] * 3
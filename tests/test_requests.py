@@ -0,0 +1,135 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+
+import ai
+
+
+class FakeClient:
+    """
+    Stands in for openai.OpenAI. Each request takes the next delay (or raises it
+    if it is an exception), close() aborts the requests still waiting.
+    """
+
+    def __init__(self, *delays):
+        self.delays = list(delays)
+        self.calls = 0
+        self.closed = threading.Event()
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, store, messages, timeout):
+        with self.lock:
+            delay = self.delays[min(self.calls, len(self.delays) - 1)]
+            self.calls += 1
+            call = self.calls
+        if isinstance(delay, Exception):
+            raise delay
+        if self.closed.wait(delay):
+            raise ConnectionError("client closed")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"Score: 70 Rationale: Approved. Request {call}"))],
+            usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=100),
+        )
+
+    def close(self):
+        self.closed.set()
+
+
+@pytest.fixture(autouse=True)
+def latencies(monkeypatch):
+    monkeypatch.setattr(ai, "requestLatencies", ai.LatencyTracker())
+    monkeypatch.setattr(ai, "WAITINTERVAL", 0.01)
+    return ai.requestLatencies
+
+
+def test_responseIsTimedAndPriced(latencies):
+    tier = ai.callModel(FakeClient(0.05), "gpt-4o", "prompt", {})
+
+    assert (tier["model"], tier["score"], tier["hedged"], tier["requests"]) == ("gpt-4o", 70, False, 1)
+    assert 0.05 <= tier["latency"] < 1
+    assert tier["cost"] == pytest.approx(ai.estimateCost("gpt-4o", 1000, 100, {}))
+    assert len(latencies.latencies["gpt-4o"]) == 1
+
+def test_requestPastDeadlineTimesOut(latencies):
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        ai.callModel(FakeClient(5), "gpt-4o", "prompt", {"REQUEST_TIMEOUT": 0.2})
+
+    assert time.perf_counter() - start < 1 # did not wait for the response
+    assert list(latencies.latencies["gpt-4o"]) == [0.2] # counted at the deadline, the late response is not recorded
+
+def test_cancelAbortsRequestInFlight(latencies):
+    client = FakeClient(5)
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+
+    with pytest.raises(ai.Cancelled):
+        ai.callModel(client, "gpt-4o", "prompt", {}, cancel)
+
+    assert client.closed.is_set()
+    time.sleep(0.05)
+    assert "gpt-4o" not in latencies.latencies # abandoned request not counted
+
+def test_cancelledBeforeSending():
+    client = FakeClient(0)
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(ai.Cancelled):
+        ai.callModel(client, "gpt-4o", "prompt", {}, cancel)
+    assert client.calls == 0
+
+def test_slowRequestIsHedged(latencies):
+    for _ in range(ai.HEDGEMINSAMPLES):
+        latencies.record("gpt-4o", 0.05)
+    client = FakeClient(5, 0.01) # first request straggles, the duplicate is fast
+
+    tier = ai.callModel(client, "gpt-4o", "prompt", {"HEDGE_REQUESTS": True})
+
+    assert (tier["output"], tier["hedged"], tier["requests"], client.calls) == ("Score: 70 Rationale: Approved. Request 2", True, 2, 2)
+    assert tier["latency"] < 1
+    assert tier["cost"] == pytest.approx(2 * ai.estimateCost("gpt-4o", 1000, 100, {})) # both requests are billed
+
+def test_noHedgeBeforeEnoughSamples(latencies):
+    for _ in range(ai.HEDGEMINSAMPLES - 1):
+        latencies.record("gpt-4o", 0.01)
+    client = FakeClient(0.1)
+
+    tier = ai.callModel(client, "gpt-4o", "prompt", {"HEDGE_REQUESTS": True})
+
+    assert (tier["hedged"], client.calls) == (False, 1)
+
+def test_hedgeSurvivesOneFailedRequest(latencies):
+    for _ in range(ai.HEDGEMINSAMPLES):
+        latencies.record("gpt-4o", 0.05)
+    client = FakeClient(0.2, ConnectionError("reset"))
+
+    tier = ai.callModel(client, "gpt-4o", "prompt", {"HEDGE_REQUESTS": True})
+
+    assert (tier["output"], tier["requests"]) == ("Score: 70 Rationale: Approved. Request 1", 2)
+
+def test_errorIsRaisedToCaller():
+    with pytest.raises(ConnectionError):
+        ai.callModel(FakeClient(ConnectionError("reset")), "gpt-4o", "prompt", {})
+
+def test_p95NeedsEnoughSamples():
+    tracker = ai.LatencyTracker()
+    for latency in range(1, ai.HEDGEMINSAMPLES):
+        tracker.record("gpt-4o", latency)
+    assert tracker.p95("gpt-4o") is None
+
+    for latency in range(ai.HEDGEMINSAMPLES, 101):
+        tracker.record("gpt-4o", latency)
+    assert tracker.p95("gpt-4o") == 95
+
+def test_unpricedModelHasNoCost(logFile, monkeypatch):
+    monkeypatch.setattr(ai, "_unpriced", set())
+    assert ai.estimateCost("gpt-unpriced", 1000, 100, {}) is None
+    assert ai.estimateCost("gpt-unpriced", 1000, 100, {}) is None
+    assert logFile.read_text().count("No price for gpt-unpriced") == 1 # warned once, not per request
+    assert ai.estimateCost("gpt-unpriced", 1000, 100, {"MODEL_PRICES": {"gpt-unpriced": [1, 2]}}) == pytest.approx(0.0012)
+
+    evaluations = [{"tiers": [ai.makeTier("gpt-unpriced", "Score: 70", 1.0, 1000, 100, {})]}]
+    assert ai.summarizeTiers(evaluations)["gpt-unpriced"]["cost"] is None
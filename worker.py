@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+import ai
+import documents
+import jobqueue
+
+
+POLLINTERVAL = 2 # Seconds to sleep when the queue is empty
+LEASEMARGIN = 120 # Seconds a job may take on top of its request deadlines, for extracting PDFs
+
+
+def buildJobs(filePaths, profiles):
+    """
+    Pairs resumes and coverletters by name and source and builds one job payload per applicant.
+
+    Args:
+        filePaths (list): PDF paths.
+        profiles (dict): Posting name -> {"criteria": str, "strength": str}.
+
+    Returns:
+        list: Job payloads.
+    """
+    pairs = documents.pairFiles(os.path.abspath(filePath) for filePath in filePaths)
+    return [{
+        "candidate": candidateKey,
+        "name": docs["Name"],
+        "resumePath": docs["Resume"],
+        "coverPath": docs["CoverLetter"],
+        "profiles": profiles,
+    } for candidateKey, docs in pairs.items()]
+
+def processJob(payload):
+    """
+    Screens an applicant against every posting in the job, extracting the PDFs once.
+
+    If some postings could not be screened the others are kept and the job is
+    not retried, it is only retried when none could be.
+
+    Args:
+        payload (dict): Job payload from buildJobs or pipeline.queueJobs.
+
+    Returns:
+        dict: {"evaluations": {posting: result of ai.evaluate}, "failed": [postings with no result]}
+    """
+    resumeText = documents.pdfToPlaintext(payload["resumePath"]) # logged on failure, there is no GUI to show it
+    coverText = documents.pdfToPlaintext(payload["coverPath"])
+
+    if not resumeText and not coverText:
+        raise ValueError(f"No text could be extracted for {payload['name']}")
+
+    evaluations = {}
+    for posting, profile in payload["profiles"].items():
+        try:
+            evaluation = ai.evaluate(payload["name"], resumeText or "None", coverText or "None", profile["criteria"], profile["strength"])
+        except SystemExit as e: # ai exits on API errors, turn that into a retryable job failure
+            raise RuntimeError(f"AI evaluation exited with code {e.code}")
+        if evaluation is not None:
+            evaluations[posting] = evaluation
+
+    if not evaluations:
+        raise RuntimeError("AI evaluation returned no result (invalid config.json or the request timed out), see the log")
+    return {"evaluations": evaluations, "failed": [posting for posting in payload["profiles"] if posting not in evaluations]}
+
+def leaseLimit(postings=1):
+    """
+    Returns the longest a job may keep its lease, in seconds.
+
+    Every cascade tier of every posting gets its full request deadline, plus LEASEMARGIN.
+
+    Args:
+        postings (int): Postings the job screens against.
+    """
+    try:
+        config = ai.loadConfig() or {}
+    except OSError: # missing config.json, the job itself will fail and log it
+        config = {}
+    tiers = 2 if ai.getCascade(config)["STRONG_MODEL"] else 1
+    return config.get("REQUEST_TIMEOUT", ai.REQUESTTIMEOUT) * tiers * postings + LEASEMARGIN
+
+def runWorker(queue, workerId, visibility=jobqueue.DEFAULTVISIBILITY, once=False):
+    """
+    Leases and processes jobs until interrupted.
+
+    The lease is extended in the background while a job runs, but only up
+    to leaseLimit(), so a crashed or hung worker's jobs are handed to
+    another worker.
+
+    Args:
+        queue (jobqueue.JobQueue): Queue to pull from.
+        workerId (str): Unique id for this worker.
+        visibility (int): Lease timeout in seconds.
+        once (bool): Exit when the queue is empty instead of polling.
+    """
+    while True:
+        job = queue.lease(workerId, visibility)
+        if job is None:
+            if once:
+                return
+            time.sleep(POLLINTERVAL)
+            continue
+
+        jobId, payload, attempts = job
+        done = threading.Event()
+        deadline = time.monotonic() + leaseLimit(len(payload["profiles"]))
+
+        def heartbeat():
+            while not done.wait(visibility / 3):
+                if time.monotonic() >= deadline:
+                    return # stuck (e.g. on a bad PDF), let the lease run out so the job is retried elsewhere
+                if not queue.extend(jobId, workerId, visibility):
+                    return # lease lost, another worker owns the job now
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            result = processJob(payload)
+            queue.complete(jobId, workerId, result)
+        except Exception as e:
+            ai.logError(e)
+            queue.fail(jobId, workerId, e)
+        finally:
+            done.set()
+
+def formatStatus(jobs):
+    """
+    Formats a batch's jobs for the status command, one line per job and a count of each state.
+
+    Args:
+        jobs (list): Jobs from JobQueue.batchStatus.
+
+    Returns:
+        str: The report.
+    """
+    lines = []
+    counts = {}
+    for job in jobs:
+        counts[job["state"]] = counts.get(job["state"], 0) + 1
+        if job["result"]:
+            detail = "; ".join(f"{posting}: {ai.parseScore(evaluation['output'])} {ai.parseApproval(evaluation['output'])}"
+                               for posting, evaluation in job["result"]["evaluations"].items())
+            if job["result"]["failed"]:
+                detail += f"; not screened for {', '.join(job['result']['failed'])}"
+        else:
+            detail = job["error"] or ""
+        lines.append(f"{job['id']}\t{job['state']}\t{job['payload'].get('candidate', job['payload']['name'])}\t{detail}")
+    lines.append(", ".join(f"{count} {state}" for state, count in sorted(counts.items())) or "No jobs in this batch")
+    return "\n".join(lines)
+
+def main():
+    """
+    Command line entry point.
+
+    python worker.py work --queue QUEUE [--config CONFIG] [--visibility SECONDS] [--once]
+    python worker.py enqueue --queue QUEUE --criteria TEXT [--strength 1-5] [--posting NAME] FILE [FILE ...]
+    python worker.py status --queue QUEUE [--json] BATCH
+    """
+    parser = argparse.ArgumentParser(description="BrightIsle CV Screener worker")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    work = commands.add_parser("work", help="Process screening jobs from the queue")
+    work.add_argument("--queue", required=True, help="Queue URL or SQLite file path")
+    work.add_argument("--config", help="config.json to use, so each worker can have its own API key")
+    work.add_argument("--visibility", type=int, default=jobqueue.DEFAULTVISIBILITY, help="Lease timeout in seconds")
+    work.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+
+    enqueue = commands.add_parser("enqueue", help="Add PDFs to the queue")
+    enqueue.add_argument("--queue", required=True, help="Queue URL or SQLite file path")
+    enqueue.add_argument("--criteria", required=True, help="Screening criteria")
+    enqueue.add_argument("--strength", type=int, choices=range(1, 6), default=3, help="Filter strength")
+    enqueue.add_argument("--posting", default="Default", help="Posting name the results are filed under")
+    enqueue.add_argument("files", nargs="+", help="Resume and coverletter PDFs")
+
+    status = commands.add_parser("status", help="Show the jobs and results of a batch")
+    status.add_argument("--queue", required=True, help="Queue URL or SQLite file path")
+    status.add_argument("--json", action="store_true", help="Print every job with its full result as JSON")
+    status.add_argument("batch", help="Batch id printed by enqueue")
+
+    args = parser.parse_args()
+    os.makedirs(ai.APPDATADIR, exist_ok=True) # log file location
+    queue = jobqueue.openQueue(args.queue)
+
+    if args.command == "work":
+        if args.config:
+            ai.CONFIGFILE = args.config
+        workerId = f"{socket.gethostname()}-{os.getpid()}"
+        try:
+            runWorker(queue, workerId, args.visibility, args.once)
+        except KeyboardInterrupt:
+            pass
+
+    elif args.command == "enqueue":
+        batch = jobqueue.newBatchId()
+        jobs = buildJobs(args.files, {args.posting: {"criteria": args.criteria, "strength": str(args.strength)}})
+        for payload in jobs:
+            queue.enqueue(payload, batch)
+        print(f"Enqueued {len(jobs)} jobs in batch {batch}, check on them with: python worker.py status --queue {args.queue} {batch}")
+
+    elif args.command == "status":
+        jobs = queue.batchStatus(args.batch)
+        print(json.dumps(jobs, indent=2) if args.json else formatStatus(jobs))
+
+
+if __name__ == "__main__":
+    main()